@@ -1,28 +1,61 @@
-import yaml
 import os
-import json
+import yaml
+import functools
+import orjson
 import logging
+import logging.handlers
+import queue
+import atexit
 import argparse
+import threading
+import heapq
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 from src.crawler import ArxivCrawler
-from src.classifier import KeywordClassifier, LLMClassifier
-from src.pdf_parser import download_and_extract_pdf_text
+from src.classifier import KeywordClassifier, LLMClassifier, LLM_SCORING_FAILED_REASON
+from src.pdf_parser import download_pdf, extract_text_from_bytes, init_parse_worker
+from src import pdf_cache
+from src.llm_cache import LLMCache, make_cache_key
 from src.summarizer import CSPaperSummarizer
 from src.reporter import MarkdownReporter
 
+# libyaml이 설치되어 있으면 C 구현 로더를 사용 (순수 파이썬 로더 대비 수 배 빠름)
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 # __file__을 기준으로 스크립트의 절대 경로와 프로젝트 루트 경로를 계산
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = SCRIPT_DIR # 이제 main.py가 루트에 있으므로 SCRIPT_DIR가 ROOT가 됩니다.
+# main.py가 루트에 있으므로 스크립트 디렉토리가 곧 프로젝트 루트입니다.
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# 로그 출력을 담당하는 백그라운드 큐 리스너
+_log_listener = None
+
+def _stop_log_listener():
+    """큐 리스너를 중지하고 남은 로그 레코드를 모두 출력"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        # 버퍼에 남아있는 파일 로그를 디스크에 기록
+        for handler in _log_listener.handlers:
+            handler.flush()
+        _log_listener = None
 
 def setup_logging(config: dict):
     """로깅 설정 초기화"""
+    global _log_listener
     log_config = config.get('logging', {})
     log_level = log_config.get('level', 'INFO').upper()
-    log_file_path = os.path.join(PROJECT_ROOT, log_config.get('file', 'logs/app.log'))
+    log_file_path = PROJECT_ROOT / log_config.get('file', 'logs/app.log')
 
     # 로그 디렉토리 생성
-    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
     # 로거 설정
     logger = logging.getLogger()
@@ -31,6 +64,7 @@ def setup_logging(config: dict):
     # 기존 핸들러 제거
     if logger.hasHandlers():
         logger.handlers.clear()
+    _stop_log_listener()
 
     # 포맷터 설정
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -39,29 +73,42 @@ def setup_logging(config: dict):
     ch = logging.StreamHandler()
     ch.setLevel(log_level)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
     # 파일 핸들러
     fh = logging.FileHandler(log_file_path, encoding='utf-8')
     fh.setLevel(log_level)
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+
+    # 파일 쓰기 시스템 콜을 줄이기 위해 레코드를 모아서 한 번에 기록 (ERROR 이상은 즉시 기록)
+    buffered_fh = logging.handlers.MemoryHandler(
+        capacity=log_config.get('buffer_size', 32),
+        flushLevel=logging.ERROR,
+        target=fh
+    )
+    buffered_fh.setLevel(log_level)
+
+    # 작업 스레드는 큐에 레코드만 넣고, 실제 콘솔/파일 출력은 백그라운드 리스너 스레드가 처리
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _log_listener = logging.handlers.QueueListener(log_queue, ch, buffered_fh, respect_handler_level=True)
+    _log_listener.start()
+    # 종료 시 큐에 남은 로그를 모두 출력
+    atexit.register(_stop_log_listener)
 
     logging.info("Logger initialized.")
 
-def load_config(config_path=os.path.join(PROJECT_ROOT, "configs/config.yaml")):
+def load_config(config_path=PROJECT_ROOT / "configs" / "config.yaml"):
     """YAML 설정 파일을 로드"""
     with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=SafeLoader)
 
 def save_papers(papers, base_path, filename):
     """크롤링된 논문 목록을 JSON 파일로 저장"""
     # 저장 경로를 프로젝트 루트 기준으로 생성
-    path = os.path.join(PROJECT_ROOT, base_path)
-    os.makedirs(path, exist_ok=True)
-    filepath = os.path.join(path, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(papers, f, ensure_ascii=False, indent=4)
+    path = PROJECT_ROOT / base_path
+    path.mkdir(parents=True, exist_ok=True)
+    filepath = path / filename
+    filepath.write_bytes(orjson.dumps(papers, option=orjson.OPT_INDENT_2))
     logging.info(f"Saved {len(papers)} papers to {filepath}")
     return filepath
 
@@ -71,23 +118,26 @@ def _save_scores(papers: list, target_date: datetime.date, config: dict):
     
     # 설정 파일에서 경로를 읽어옴
     base_path = config.get("storage", {}).get("scored_path", "data/scores")
-    path = os.path.join(PROJECT_ROOT, base_path)
-    os.makedirs(path, exist_ok=True)
-    filepath = os.path.join(path, f"{date_str}-scores.json")
-    
-    # JSON 직렬화를 위해 datetime 객체를 문자열로 변환
-    def convert_datetime(obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+    path = PROJECT_ROOT / base_path
+    path.mkdir(parents=True, exist_ok=True)
+    filepath = path / f"{date_str}-scores.json"
 
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(papers, f, ensure_ascii=False, indent=4, default=convert_datetime)
+        # orjson은 datetime 객체를 ISO 8601 문자열로 직접 직렬화
+        filepath.write_bytes(orjson.dumps(papers, option=orjson.OPT_INDENT_2))
         logging.info(f"Saved {len(papers)} scored papers to {filepath}")
     except Exception as e:
         logging.error(f"Failed to save scored papers to {filepath}: {e}", exc_info=True)
 
+@functools.lru_cache(maxsize=1)
+def _read_sample_papers_bytes(path: Path) -> bytes:
+    """샘플 데이터 파일을 한 번만 읽어 캐시"""
+    return path.read_bytes()
+
+def _load_sample_papers(path: Path) -> list:
+    """로컬 샘플 논문 데이터를 로드 (호출마다 새 객체를 반환하여 캐시된 데이터가 변경되지 않도록 함)"""
+    return orjson.loads(_read_sample_papers_bytes(path))
+
 def _crawl_papers(config: dict, target_date: datetime.date, days_to_fetch: int, window_based: bool) -> list:
     """
     설정에 따라 논문을 크롤링합니다.
@@ -129,10 +179,9 @@ def _crawl_papers(config: dict, target_date: datetime.date, days_to_fetch: int,
     # --- 기존 날짜 기반 크롤링 로직 ---
     if not target_date and days_to_fetch == 1:
         logging.warning("No date specified, using local sample data.")
-        sample_path = os.path.join(PROJECT_ROOT, "configs/sample_papers.json")
+        sample_path = PROJECT_ROOT / "configs" / "sample_papers.json"
         try:
-            with open(sample_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_sample_papers(sample_path)
         except FileNotFoundError:
             logging.error(f"Sample data file not found at {sample_path}. Please create it or set use_sample=False.")
             return []
@@ -154,6 +203,22 @@ def _crawl_papers(config: dict, target_date: datetime.date, days_to_fetch: int,
             logging.error(f"Error fetching from Arxiv: {e}", exc_info=True)
     return all_new_papers
 
+def _get_llm_cache(config: dict):
+    """설정에 따라 LLM 결과 캐시를 생성합니다. 비활성화 시 None을 반환"""
+    cache_config = config.get("llm_cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    try:
+        return LLMCache(PROJECT_ROOT / cache_config.get("path", "data/llm_cache.sqlite"), ttl_days=cache_config.get("cache_ttl_days"))
+    except Exception as e:
+        logging.warning(f"Failed to open LLM cache. Continuing without cache: {e}")
+        return None
+
+def _scoring_cache_key(paper: dict, llm_scorer_config: dict) -> str:
+    """LLM 스코어링 결과 캐시 키 (관심사 설명이 바뀌면 캐시도 무효화)"""
+    content = f"{llm_scorer_config.get('interests', '')}\n{paper.get('title', '')}\n{paper.get('abstract', '')}"
+    return make_cache_key(paper.get("arxiv_id"), llm_scorer_config.get("model"), llm_scorer_config.get("prompt_version"), content)
+
 def _filter_and_score_papers(papers: list, config: dict) -> list:
     """키워드와 LLM을 사용하여 논문을 필터링하고 점수를 매깁니다."""
     logging.info("--- Step 1: Keyword-based Pre-filtering ---")
@@ -185,19 +250,44 @@ def _filter_and_score_papers(papers: list, config: dict) -> list:
 
     try:
         logging.info("--- Step 2: LLM-based Scoring ---")
-        groq_config = config.get("groq_settings", {})
-        llm_classifier = LLMClassifier(config=llm_scorer_config, groq_config=groq_config)
-        
-        # LLM으로 스코어링 된 논문들 (llm_score, llm_reason 추가됨)
-        llm_scored_papers = llm_classifier.score(papers_to_process)
-        
-        # 결과를 원래 논문 리스트에 다시 반영하기 위한 룩업 테이블 생성
-        llm_scored_map = {p["arxiv_id"]: p for p in llm_scored_papers}
+
+        # 이전 실행에서 스코어링한 논문은 캐시된 결과를 사용하고, 나머지만 LLM으로 처리
+        llm_cache = _get_llm_cache(config)
+        uncached_papers = []
+        for paper in papers_to_process:
+            cached = llm_cache.get(_scoring_cache_key(paper, llm_scorer_config)) if llm_cache else None
+            if cached:
+                paper['llm_score'] = cached.get('llm_score')
+                paper['llm_reason'] = cached.get('llm_reason')
+            else:
+                uncached_papers.append(paper)
+        if llm_cache:
+            logging.info(f"Loaded {len(papers_to_process) - len(uncached_papers)} LLM scores from cache.")
+
+        llm_scored_map = {}
+        if uncached_papers:
+            groq_config = config.get("groq_settings", {})
+            llm_classifier = LLMClassifier(config=llm_scorer_config, groq_config=groq_config)
+
+            # LLM으로 스코어링 된 논문들 (llm_score, llm_reason 추가됨)
+            llm_scored_papers = llm_classifier.score(uncached_papers)
+
+            # 실패한 결과는 다음 실행에서 다시 시도하도록 캐시하지 않음
+            if llm_cache:
+                for paper in uncached_papers:
+                    if paper.get('llm_reason') != LLM_SCORING_FAILED_REASON:
+                        llm_cache.set(
+                            _scoring_cache_key(paper, llm_scorer_config),
+                            {'llm_score': paper.get('llm_score'), 'llm_reason': paper.get('llm_reason')}
+                        )
+
+            # 결과를 원래 논문 리스트에 다시 반영하기 위한 룩업 테이블 생성
+            llm_scored_map = {p["arxiv_id"]: p for p in llm_scored_papers}
         
         # 전체 논문 리스트를 순회하며 LLM 점수 업데이트
         for paper in pre_filtered_papers:
-            if paper["arxiv_id"] in llm_scored_map:
-                updated_paper = llm_scored_map[paper["arxiv_id"]]
+            updated_paper = llm_scored_map.get(paper["arxiv_id"])
+            if updated_paper is not None:
                 paper['llm_score'] = updated_paper.get('llm_score')
                 paper['llm_reason'] = updated_paper.get('llm_reason')
 
@@ -212,6 +302,61 @@ def _filter_and_score_papers(papers: list, config: dict) -> list:
         logging.warning("Falling back to keyword-based scores.")
         return pre_filtered_papers
 
+def _ranking_key(paper: dict) -> tuple:
+    """다단계 정렬 키: 1. LLM 점수, 2. 키워드 점수"""
+    return (paper.get('llm_score') or 0, paper.get('score') or 0)
+
+def _summarize_one(paper: dict, full_text: str, summarizer: Optional[CSPaperSummarizer], summarizer_config: dict, max_len: int, llm_semaphore: threading.Semaphore, llm_cache=None) -> dict:
+    """미리 추출한 PDF 본문으로 단일 논문의 T.A.R.G.E.T. 요약을 채워 넣습니다."""
+    content_to_summarize = ""
+    source_for_summary = ""
+
+    if not full_text:
+        logging.warning(f"Could not retrieve full text for paper '{paper.get('title')}'. Skipping summarization.")
+        paper['target_summary'] = None
+        return paper
+
+    if len(full_text) > max_len:
+        logging.info(f"Paper is too long ({len(full_text)} chars). Summarizing abstract only.")
+        content_to_summarize = paper.get('abstract', '')
+        source_for_summary = "Abstract"
+    else:
+        logging.info(f"Paper length ({len(full_text)} chars) is within limits. Summarizing full text.")
+        content_to_summarize = full_text
+        source_for_summary = "Full Text"
+
+    if content_to_summarize:
+        cache_key = make_cache_key(
+            paper.get('arxiv_id'), summarizer_config.get("reduce_model"), summarizer_config.get("prompt_version"), content_to_summarize
+        )
+        cached_summary = llm_cache.get(cache_key) if llm_cache else None
+        if cached_summary:
+            logging.info(f"Loaded summary for paper '{paper.get('title')}' from cache.")
+            paper['target_summary'] = cached_summary
+            return paper
+
+        if summarizer is None:
+            paper['target_summary'] = None
+            return paper
+
+        try:
+            # Groq 요청 한도를 넘지 않도록 동시에 요약하는 논문 수를 제한
+            with llm_semaphore:
+                summary = summarizer.summarize(content_to_summarize, show_progress=False)
+            if summary:
+                summary['source'] = source_for_summary # 요약 소스 정보 추가
+                if llm_cache:
+                    llm_cache.set(cache_key, summary)
+            paper['target_summary'] = summary
+        except Exception as e:
+            logging.error(f"Error during summarization for paper '{paper.get('title')}': {e}", exc_info=True)
+            paper['target_summary'] = None
+    else:
+        logging.warning(f"No content to summarize for paper '{paper.get('title')}'.")
+        paper['target_summary'] = None
+
+    return paper
+
 def _summarize_papers(papers: list, config: dict) -> list:
     """상위 논문들을 T.A.R.G.E.T. 프레임워크로 요약합니다."""
     summarizer_config = config.get("summarizer", {})
@@ -220,64 +365,142 @@ def _summarize_papers(papers: list, config: dict) -> list:
         return papers
 
     logging.info("--- Step 3: T.A.R.G.E.T. Summarization ---")
-    # 다단계 정렬: 1. LLM 점수, 2. 키워드 점수
-    papers.sort(key=lambda p: (p.get('llm_score', 0), p.get('score', 0)), reverse=True)
-    
     # 리포트에 포함될 top_n 만큼만 요약을 수행
     limit = config.get("reporter", {}).get("top_n", 10)
     if limit <= 0:
         limit = len(papers)
-        
-    papers_to_summarize = papers[:min(len(papers), limit)]
-    final_papers = []
+
+    # 전체 정렬 없이 다단계 정렬 키 기준 상위 limit개만 선택 (O(N log K))
+    papers_to_summarize = heapq.nlargest(limit, papers, key=_ranking_key)
+    selected_ids = {id(p) for p in papers_to_summarize}
+    remaining_papers = [p for p in papers if id(p) not in selected_ids]
     
     max_len = summarizer_config.get("max_text_length_for_full_summary", 100000)
+    max_pages = summarizer_config.get("max_pages")
+    stop_at_references = summarizer_config.get("stop_at_references", True)
+    groq_config = config.get("groq_settings", {})
+    workers = summarizer_config.get("workers", 8)
+    llm_semaphore = threading.Semaphore(summarizer_config.get("max_concurrent_llm_calls", 2))
+    llm_cache = _get_llm_cache(config)
+
+    # LLM 클라이언트(HTTP 연결)를 논문마다 새로 만들지 않도록 요약기를 한 번만 생성하여 공유
+    try:
+        summarizer = CSPaperSummarizer(config=summarizer_config, groq_config=groq_config, llm_cache=llm_cache)
+    except Exception as e:
+        # 캐시된 요약은 여전히 사용할 수 있으므로 중단하지 않고 진행
+        logging.error(f"Error initializing summarizer: {e}", exc_info=True)
+        summarizer = None
+
+    # 이전 실행에서 추출한 PDF 텍스트가 있으면 캐시에서 재사용
+    cache_config = config.get("pdf_cache", {})
+    cache_dir = PROJECT_ROOT / cache_config.get("path", "data/pdf_cache") if cache_config.get("enabled", False) else None
+    max_age_days = cache_config.get("max_age_days", 30)
+
+    # 다운로드(네트워크) -> 텍스트 추출(CPU) -> 요약(LLM) 단계를 각각의 풀에서 파이프라인으로 실행하여
+    # 먼저 준비된 논문부터 다음 단계로 넘김 (전체 소요 시간 ≈ 가장 느린 단계의 시간)
+    download_workers = summarizer_config.get("pdf_concurrency", 4)
+    parse_workers = summarizer_config.get("parse_workers") or os.cpu_count() or 1
+    parse_workers = max(1, min(parse_workers, len(papers_to_summarize)))
+    final_papers = [None] * len(papers_to_summarize)
+
+    # PDF 텍스트 추출은 CPU 작업이라 GIL을 피하기 위해 별도 프로세스에서 수행
+    # (작업 스레드가 실행 중인 상태에서 fork하지 않도록 spawn 컨텍스트를 사용)
+    mp_context = multiprocessing.get_context("spawn")
+    # 워커 로그는 프로세스 간 큐로 받아 메인 프로세스의 로깅 핸들러(큐 리스너)로 그대로 넘김
+    worker_log_queue = mp_context.Queue()
+    worker_log_listener = logging.handlers.QueueListener(worker_log_queue, *logging.getLogger().handlers)
+    worker_log_listener.start()
+    parse_pool = ProcessPoolExecutor(
+        max_workers=parse_workers,
+        mp_context=mp_context,
+        initializer=init_parse_worker,
+        initargs=(worker_log_queue, logging.getLogger().getEffectiveLevel())
+    )
 
-    for i, paper in enumerate(papers_to_summarize):
-        logging.info(f"Summarizing paper {i+1}/{len(papers_to_summarize)}: \"{paper.get('title', '')[:50]}...\"")
-        
-        content_to_summarize = ""
-        source_for_summary = ""
-
-        full_text = download_and_extract_pdf_text(paper.get('pdf_url'))
-        
-        if not full_text:
-            logging.warning(f"Could not retrieve full text for paper '{paper.get('title')}'. Skipping summarization.")
-            paper['target_summary'] = None
-            final_papers.append(paper)
-            continue
-
-        if len(full_text) > max_len:
-            logging.info(f"Paper is too long ({len(full_text)} chars). Summarizing abstract only.")
-            content_to_summarize = paper.get('abstract', '')
-            source_for_summary = "Abstract"
-        else:
-            logging.info(f"Paper length ({len(full_text)} chars) is within limits. Summarizing full text.")
-            content_to_summarize = full_text
-            source_for_summary = "Full Text"
-
-        if content_to_summarize:
-            try:
-                groq_config = config.get("groq_settings", {})
-                summarizer = CSPaperSummarizer(
-                    document_content=content_to_summarize, 
-                    config=summarizer_config,
-                    groq_config=groq_config
-                )
-                summary = summarizer.summarize(show_progress=False)
-                if summary:
-                    summary['source'] = source_for_summary # 요약 소스 정보 추가
-                paper['target_summary'] = summary
-            except Exception as e:
-                logging.error(f"Error during summarization for paper '{paper.get('title')}': {e}", exc_info=True)
-                paper['target_summary'] = None
-        else:
-            logging.warning(f"No content to summarize for paper '{paper.get('title')}'.")
-            paper['target_summary'] = None
-
-        final_papers.append(paper)
-
-    final_papers.extend(papers[len(papers_to_summarize):])
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, download_workers)) as download_pool, \
+             parse_pool, \
+             ThreadPoolExecutor(max_workers=max(1, workers)) as summary_pool:
+
+            pending = {}  # future -> (단계, 논문 인덱스)
+            parse_inputs = {}  # 논문 인덱스 -> PDF 바이트 (프로세스 풀이 깨지면 다시 추출하기 위해 보관)
+            parse_executor = parse_pool
+
+            def fall_back_to_in_process_parsing(error: BrokenProcessPool):
+                """워커 프로세스가 비정상 종료(OOM 등)되어 풀이 깨지면 남은 추출은 현재 프로세스의 스레드에서 수행"""
+                nonlocal parse_executor
+                if parse_executor is parse_pool:
+                    logging.error(f"PDF parse worker pool is broken ({error}). Falling back to in-process extraction.")
+                    parse_executor = download_pool
+
+            def submit_parse(i: int, data: bytes):
+                paper = papers_to_summarize[i]
+                parse_inputs[i] = data
+                args = (extract_text_from_bytes, data, paper.get('pdf_url'), max_pages, stop_at_references)
+                try:
+                    future = parse_executor.submit(*args)
+                except BrokenProcessPool as e:
+                    fall_back_to_in_process_parsing(e)
+                    future = parse_executor.submit(*args)
+                pending[future] = ("parse", i)
+
+            def submit_summary(i: int, full_text: Optional[str]):
+                paper = papers_to_summarize[i]
+                logging.info(f"Summarizing paper {i+1}/{len(papers_to_summarize)}: \"{paper.get('title', '')[:50]}...\"")
+                future = summary_pool.submit(_summarize_one, paper, full_text, summarizer, summarizer_config, max_len, llm_semaphore, llm_cache)
+                pending[future] = ("summarize", i)
+
+            for i, paper in enumerate(papers_to_summarize):
+                cached_text = None
+                if cache_dir and paper.get('arxiv_id'):
+                    cached_text = pdf_cache.load_cached_text(cache_dir, paper['arxiv_id'], max_age_days, max_pages, stop_at_references)
+                if cached_text is not None:
+                    logging.info(f"Loaded PDF text for {paper['arxiv_id']} from cache ({len(cached_text)} chars)")
+                    submit_summary(i, cached_text)
+                else:
+                    pending[download_pool.submit(download_pdf, paper.get('pdf_url'))] = ("download", i)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, i = pending.pop(future)
+                    paper = papers_to_summarize[i]
+                    # 한 논문의 예기치 못한 오류가 다른 논문의 처리와 리포트 생성을 중단시키지 않도록 논문 단위로 격리
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        fall_back_to_in_process_parsing(e)
+                        submit_parse(i, parse_inputs.pop(i))
+                        continue
+                    except Exception as e:
+                        logging.error(f"Unexpected error in {stage} stage for paper '{paper.get('title')}': {e}", exc_info=True)
+                        parse_inputs.pop(i, None)
+                        if stage == "summarize":
+                            paper['target_summary'] = None
+                            final_papers[i] = paper
+                        else:
+                            submit_summary(i, None)
+                        continue
+
+                    if stage == "download":
+                        if result is None:
+                            submit_summary(i, None)
+                        else:
+                            submit_parse(i, result)
+                    elif stage == "parse":
+                        parse_inputs.pop(i, None)
+                        if result and cache_dir and paper.get('arxiv_id'):
+                            pdf_cache.save_cached_text(cache_dir, paper['arxiv_id'], result, max_pages, stop_at_references)
+                        submit_summary(i, result)
+                    else:
+                        # 원래 순서를 유지하기 위해 인덱스 위치에 결과를 저장
+                        final_papers[i] = result
+    finally:
+        # 워커 로그를 모두 넘긴 뒤 리스너와 큐를 정리
+        worker_log_listener.stop()
+        worker_log_queue.close()
+
+    final_papers.extend(remaining_papers)
     return final_papers
 
 def _generate_report(papers: list, config: dict, target_date: datetime.date):
@@ -286,7 +509,7 @@ def _generate_report(papers: list, config: dict, target_date: datetime.date):
     try:
         reporter = MarkdownReporter(config=config)
         # 리포트 생성을 위해 최종적으로 다단계 정렬 수행
-        papers.sort(key=lambda p: (p.get('llm_score', 0), p.get('score', 0)), reverse=True)
+        papers.sort(key=_ranking_key, reverse=True)
         reporter.generate_report(papers=papers, project_root=PROJECT_ROOT, target_date=target_date)
     except Exception as e:
         logging.error(f"Failed to generate report: {e}", exc_info=True)
@@ -2,10 +2,17 @@ import os
 import smtplib
 import argparse
 import re
+import mmap
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 
+# 리포트에서 "Top N" 요약 섹션만 추출하는 패턴 (모듈 로드 시 한 번만 컴파일)
+# mmap으로 읽은 바이트에 직접 적용하기 위해 bytes 패턴으로 컴파일합니다.
+_TOP_SECTION_RE = re.compile(r"(## 🌟 Top.*?)(?=## 📝 Other Noteworthy Papers|\Z)".encode('utf-8'), re.DOTALL)
+# 콤마, 세미콜론, 공백 등 수신자 구분자
+_RECIP_RE = re.compile(r'[,;\s]+')
+
 def create_summary_and_link(report_path: str, github_repo_slug: str) -> str:
     """
     리포트 파일에서 Top-N 요약 섹션을 추출하고 GitHub 링크를 추가합니다.
@@ -13,15 +20,15 @@ def create_summary_and_link(report_path: str, github_repo_slug: str) -> str:
     if not os.path.exists(report_path):
         return "생성된 리포트 파일을 찾을 수 없습니다."
 
-    with open(report_path, 'r', encoding='utf-8') as f:
-        full_content = f.read()
-
-    # 정규표현식을 사용하여 "Top N" 요약 섹션만 추출합니다.
-    match = re.search(r"(## 🌟 Top.*?)(?=## 📝 Other Noteworthy Papers|\Z)", full_content, re.DOTALL)
-    
     summary_section = "리포트에서 Top-N 요약 섹션을 찾지 못했습니다."
-    if match:
-        summary_section = match.group(1).strip()
+
+    # 파일 전체를 문자열로 복사하지 않고 mmap 위에서 직접 정규표현식으로 "Top N" 요약 섹션만 추출합니다.
+    if os.path.getsize(report_path) > 0:
+        with open(report_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            match = _TOP_SECTION_RE.search(mm)
+            if match:
+                # 매칭된 구간만 디코딩
+                summary_section = match.group(1).decode('utf-8').strip()
 
     # GitHub의 전체 리포트 링크를 생성합니다.
     report_filename = os.path.basename(report_path)
@@ -86,7 +93,7 @@ if __name__ == '__main__':
         raise ValueError("Missing required environment variables: MAIL_RECIPIENTS, GMAIL_USER, GMAIL_APP_PASSWORD")
 
     # 콤마, 세미콜론, 공백 등으로 구분된 이메일 주소 문자열을 파싱하여 리스트로 만듭니다.
-    recipient_list = [email.strip() for email in re.split(r'[,;\s]+', recipients_str) if email.strip()]
+    recipient_list = [email.strip() for email in _RECIP_RE.split(recipients_str) if email.strip()]
     if not recipient_list:
         raise ValueError("MAIL_RECIPIENTS environment variable is empty or invalid.")
 
@@ -1,15 +1,23 @@
 import os
 import json
 import logging
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
 
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
-from groq import RateLimitError, APIError
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
 from .base import AbstractClassifier
 from .llm_services import BaseLLMService
 
+try:
+    import ahocorasick
+except ImportError:
+    # 미설치 환경에서는 키워드별 부분 문자열 검사로 동작
+    ahocorasick = None
+
+# LLM 스코어링 실패 시 llm_reason에 기록되는 메시지
+LLM_SCORING_FAILED_REASON = "LLM scoring failed."
+
 class KeywordClassifier:
     """
     키워드 기반으로 논문의 점수를 매기는 분류기 (1차 필터링용)
@@ -22,49 +30,62 @@ class KeywordClassifier:
         if not keyword_weights:
             raise ValueError("keyword_weights must not be empty.")
         self.keyword_weights = {k.lower(): v for k, v in keyword_weights.items()}
+        self._keyword_items = tuple(self.keyword_weights.items())
+
+        # pyahocorasick이 설치되어 있으면 모든 키워드를 한 번의 텍스트 스캔으로 찾는 오토마톤을 구성
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, weight in self.keyword_weights.items():
+                self._automaton.add_word(keyword, (keyword, weight))
+            self._automaton.make_automaton()
+
+    def _match_keywords(self, text: str) -> List[tuple]:
+        """텍스트에 포함된 (키워드, 가중치) 목록을 설정 순서대로 반환 (키워드당 한 번만 계산)"""
+        if self._automaton is not None:
+            found = {keyword for _, (keyword, _) in self._automaton.iter(text)}
+            return [(k, w) for k, w in self._keyword_items if k in found]
+        return [(k, w) for k, w in self._keyword_items if k in text]
 
     def score(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         논문 목록을 받아 각 논문에 점수를 매기고 정렬하여 반환
         """
-        scored_papers = []
-        for paper in papers:
+        # 검색할 텍스트 필드 (제목과 초록)를 이어붙인 뒤 한 번만 소문자로 변환
+        texts = [f"{paper.get('title', '')} {paper.get('abstract', '')}".lower() for paper in papers]
+
+        # 점수가 0보다 큰 논문만 모으면서 점수를 기록
+        hits = []
+        for paper, text_to_search in zip(papers, texts):
             score = 0
             reasons = []
-            
-            # 검색할 텍스트 필드 (제목과 초록)
-            text_to_search = f"{paper.get('title', '').lower()} {paper.get('abstract', '').lower()}"
-            
-            for keyword, weight in self.keyword_weights.items():
-                if keyword in text_to_search:
-                    score += weight
-                    reasons.append(f"Found '{keyword}' (score: +{weight})")
-            
-            paper['score'] = score
-            paper['keyword_reasons'] = reasons
-            scored_papers.append(paper)
-            
-        # 점수가 0보다 큰 논문만 필터링하고, 점수 기준으로 내림차순 정렬
-        filtered_and_sorted = sorted(
-            [p for p in scored_papers if p['score'] > 0],
-            key=lambda x: x['score'],
-            reverse=True
-        )
-        
-        return filtered_and_sorted
+
+            for keyword, weight in self._match_keywords(text_to_search):
+                score += weight
+                reasons.append(f"Found '{keyword}' (score: +{weight})")
+
+            if score > 0:
+                paper['score'] = score
+                paper['keyword_reasons'] = reasons
+                hits.append(paper)
+
+        # 점수 기준으로 내림차순 정렬
+        hits.sort(key=itemgetter('score'), reverse=True)
+        return hits
 
 class LLMClassifier(AbstractClassifier, BaseLLMService):
     """LLM을 사용하여 논문의 점수를 매기는 분류기"""
 
-    def __init__(self, config: dict, groq_config: dict):
+    def __init__(self, config: dict, groq_config: dict, http_client: Optional[httpx.Client] = None):
         """
             LLMClassifier를 초기화합니다.
 
             :param config: llm_scorer에 대한 설정 딕셔너리
             :param groq_config: groq_settings에 대한 공통 설정 딕셔너리
+            :param http_client: Groq 호출에 사용할 httpx 클라이언트 (기본값: 파이프라인 공유 클라이언트)
         """
         combined_config = {**groq_config, **config}
-        super().__init__(config=combined_config)
+        super().__init__(config=combined_config, http_client=http_client)
         
         self.interests = config.get("interests", "")
         if not self.interests:
@@ -72,7 +93,13 @@ class LLMClassifier(AbstractClassifier, BaseLLMService):
         
         prompt_path = os.path.join(os.path.dirname(__file__), '..', 'configs', 'prompt.json')
         with open(prompt_path, 'r', encoding='utf-8') as f:
-            self.prompt_template = json.load(f)["scoring"]
+            prompts = json.load(f)
+            self.prompt_template = prompts["scoring"]
+            self.batch_prompt_template = prompts["batch_scoring"]
+
+        # 한 번의 LLM 호출로 스코어링할 논문 수와 동시에 처리할 배치 수
+        self.batch_size = max(1, config.get("batch_size", 1))
+        self.max_workers = max(1, config.get("max_workers", 4))
 
     def score_paper(self, paper: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """단일 논문에 대해 LLM 기반 스코어링 수행"""
@@ -99,25 +126,71 @@ class LLMClassifier(AbstractClassifier, BaseLLMService):
             logging.error(f"Error processing LLM response for paper '{paper.get('title', '')[:20]}...': {e}", exc_info=True)
             return None
 
-    def score(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """논문 목록을 받아 각 논문에 LLM 기반 점수를 매기고 정렬하여 반환"""
-        scored_papers = []
-        for i, paper in enumerate(papers):
-            logging.info(f"LLM Scoring paper {i+1}/{len(papers)}: \"{paper.get('title', '')[:50]}...\"")
-            
-            response = self.score_paper(paper)
-            
+    def score_batch(self, papers: List[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        여러 논문을 한 번의 LLM 호출로 스코어링하여 {arxiv_id: 응답} 딕셔너리로 반환합니다.
+        모든 폴백 모델에서 호출 자체가 실패하면 None을 반환합니다.
+        """
+        papers_text = "\n\n".join(
+            f"ID: {paper.get('arxiv_id', '')}\nTitle: {paper.get('title', '')}\nAbstract: {paper.get('abstract', '')}"
+            for paper in papers
+        )
+        user_prompt = self.batch_prompt_template["user_prompt"].format(
+            interests=self.interests,
+            papers=papers_text
+        )
+        messages = [
+            {"role": "system", "content": self.batch_prompt_template["system_prompt"]},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        try:
+            response_str = self._invoke_with_fallback(messages, is_json=True)
+            if response_str is None:
+                logging.error(f"LLM batch scoring failed for {len(papers)} papers after trying all fallback models.")
+                return None
+            results = json.loads(response_str).get("results", [])
+            return {str(r.get("id")): r for r in results if isinstance(r, dict)}
+        except Exception as e:
+            logging.error(f"Error processing LLM batch response for {len(papers)} papers: {e}", exc_info=True)
+            return {}
+
+    def _score_and_apply(self, batch: List[Dict[str, Any]]):
+        """
+        배치 단위로 스코어링한 결과를 각 논문에 반영합니다.
+        응답에서 누락된 논문만 개별 스코어링하고, 호출 자체가 실패한 배치는 API 부하를 늘리지 않도록 바로 실패로 기록합니다.
+        """
+        responses = self.score_batch(batch) if len(batch) > 1 else {}
+        for paper in batch:
+            if responses is None:
+                response = None
+            else:
+                response = responses.get(paper.get('arxiv_id'))
+                if not (response and 'score' in response and 'reasons' in response):
+                    response = self.score_paper(paper)
+
             if response and 'score' in response and 'reasons' in response:
                 paper['llm_score'] = response.get('score', 0)
                 paper['llm_reason'] = response.get('reasons', 'N/A')
             else:
                 paper['llm_score'] = 0
-                paper['llm_reason'] = "LLM scoring failed."
-            
-            scored_papers.append(paper)
-            
+                paper['llm_reason'] = LLM_SCORING_FAILED_REASON
+
+    def score(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """논문 목록을 받아 각 논문에 LLM 기반 점수를 매기고 정렬하여 반환"""
+        batches = [papers[i:i + self.batch_size] for i in range(0, len(papers), self.batch_size)]
+        logging.info(f"LLM Scoring {len(papers)} papers in {len(batches)} batch(es) of up to {self.batch_size}...")
+
+        # LLM 호출은 네트워크 대기가 대부분이므로 배치들을 스레드로 동시에 처리 (배치가 하나면 스레드 없이 바로 호출)
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                list(executor.map(self._score_and_apply, batches))
+        else:
+            for batch in batches:
+                self._score_and_apply(batch)
+
         filtered_and_sorted = sorted(
-            [p for p in scored_papers if p.get('llm_score', 0) > 0],
+            [p for p in papers if p.get('llm_score', 0) > 0],
             key=lambda x: x.get('llm_score', 0),
             reverse=True
         )
@@ -13,6 +13,15 @@ class ArxivCrawler(AbstractCrawler):
     """
     source_name = "arxiv"
 
+    def __init__(self, page_size: int = 2000, delay_seconds: float = 3.0, num_retries: int = 5):
+        """
+        :param page_size: API 요청 한 번에 받아올 논문 수 (arXiv 최대 2000)
+        :param delay_seconds: 페이지 요청 사이의 대기 시간 (arXiv 권장 최소값 3초)
+        :param num_retries: 페이지 요청 실패 시 재시도 횟수
+        """
+        # 두 fetch 메서드가 같은 클라이언트(및 내부 HTTP 세션)를 재사용
+        self._client = arxiv.Client(page_size=page_size, delay_seconds=delay_seconds, num_retries=num_retries)
+
     def fetch_by_time_window(self, queries: List[str], max_results: int = 100, end_date_utc: datetime.date = None, days: int = 1, end_hour_et: int = 14) -> List[Dict[str, Any]]:
         """
         ET 기준 특정 시간 윈도우에 제출된 논문을 검색합니다.
@@ -35,9 +44,14 @@ class ArxivCrawler(AbstractCrawler):
         # UTC 기준 시작 시각 설정
         start_dt_utc = end_dt_utc - timedelta(days=days)
 
+        # 제출 시각 범위를 쿼리에 포함시켜 윈도우 밖의 논문 페이지를 서버에서부터 받지 않도록 함
+        search_query = (
+            f"({search_query}) AND submittedDate:"
+            f"[{start_dt_utc.strftime('%Y%m%d%H%M%S')} TO {end_dt_utc.strftime('%Y%m%d%H%M%S')}]"
+        )
+
         logging.info(f"Executing Arxiv search for papers submitted between {start_dt_utc.strftime('%Y-%m-%d %H:%M:%S UTC')} and {end_dt_utc.strftime('%Y-%m-%d %H:%M:%S UTC')}")
         
-        client = arxiv.Client()
         search = arxiv.Search(
             query=search_query,
             max_results=max_results,
@@ -45,9 +59,10 @@ class ArxivCrawler(AbstractCrawler):
             sort_order=arxiv.SortOrder.Descending
         )
 
-        results = []
+        results = {}
+        source_name = self.source_name
         try:
-            for r in client.results(search):
+            for r in self._client.results(search):
                 # r.published는 이미 UTC 시간대로 가정 (arxiv 라이브러리 특성)
                 submitted_dt_utc = r.published
 
@@ -56,26 +71,28 @@ class ArxivCrawler(AbstractCrawler):
                     break
                 
                 if start_dt_utc <= submitted_dt_utc < end_dt_utc:
-                    item = {
+                    # 중복 논문은 item을 만들기 전에 건너뜀
+                    arxiv_id = r.entry_id.rsplit('/', 1)[-1]
+                    if arxiv_id in results:
+                        continue
+                    results[arxiv_id] = {
                         "title": r.title,
                         "abstract": r.summary.replace('\\n', ' '),
                         "url": r.entry_id,
                         "pdf_url": r.pdf_url,
-                        "arxiv_id": r.entry_id.split('/')[-1],
+                        "arxiv_id": arxiv_id,
                         "authors": [author.name for author in r.authors],
-                        "submitted": r.published.strftime("%Y-%m-%d %H:%M:%S"),
-                        "source": self.source_name,
+                        "submitted": submitted_dt_utc.strftime("%Y-%m-%d %H:%M:%S"),
+                        "source": source_name,
                         "comment": r.comment,
                     }
-                    if item not in results:
-                        results.append(item)
         except arxiv.UnexpectedEmptyPageError:
             logging.info("Reached the end of available results from Arxiv API.")
         except Exception as e:
             logging.error(f"Failed to fetch results from Arxiv API: {e}", exc_info=True)
         
         logging.info(f"Found {len(results)} valid papers from Arxiv for the specified time window.")
-        return results
+        return list(results.values())
 
     def fetch(self, queries: List[str], max_results: int = 100, target_date: datetime.date = None, days_to_fetch: int = 1) -> List[Dict[str, Any]]:
         """
@@ -113,7 +130,6 @@ class ArxivCrawler(AbstractCrawler):
 
         logging.info(f"Executing Arxiv search with query: {query}")
 
-        client = arxiv.Client()
         search = arxiv.Search(
             query=query,
             max_results=max_results,
@@ -121,30 +137,32 @@ class ArxivCrawler(AbstractCrawler):
             sort_order=arxiv.SortOrder.Descending
         )
 
-        results = []
-        
+        results = {}
+        source_name = self.source_name
+
         try:
-            for r in client.results(search):
+            for r in self._client.results(search):
                 # The date filtering is now part of the query, but we can double-check
                 published_date = r.published.date()
                 if from_date and to_date:
                     if not (from_date <= published_date <= to_date):
                         continue
 
-                item = {
+                # 중복 추가 방지 (arxiv_id 기준, item을 만들기 전에 검사)
+                arxiv_id = r.entry_id.rsplit('/', 1)[-1]
+                if arxiv_id in results:
+                    continue
+                results[arxiv_id] = {
                     "title": r.title,
                     "abstract": r.summary.replace('\n', ' '),
                     "url": r.entry_id,
                     "pdf_url": r.pdf_url,
-                    "arxiv_id": r.entry_id.split('/')[-1],
+                    "arxiv_id": arxiv_id,
                     "authors": [author.name for author in r.authors],
                     "submitted": r.published.strftime("%Y-%m-%d %H:%M:%S"),
-                    "source": self.source_name,
+                    "source": source_name,
                     "comment": r.comment,
                 }
-                # 중복 추가 방지
-                if item not in results:
-                    results.append(item)
 
         except arxiv.UnexpectedEmptyPageError:
             logging.info("Reached the end of available results from Arxiv API.")
@@ -152,7 +170,7 @@ class ArxivCrawler(AbstractCrawler):
             logging.error(f"Failed to fetch results from Arxiv API: {e}", exc_info=True)
         
         logging.info(f"Found {len(results)} valid papers from Arxiv for the period {from_date} to {to_date}.")
-        return results
+        return list(results.values())
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Standalone Arxiv Crawler for debugging.")
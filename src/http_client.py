@@ -0,0 +1,35 @@
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_session(pool_connections: int = 16, pool_maxsize: int = 64) -> requests.Session:
+    """
+    커넥션 풀과 재시도 정책이 설정된 requests.Session을 생성합니다.
+    같은 호스트(arxiv.org 등)로의 요청은 TCP/TLS 연결을 재사용합니다.
+
+    :param pool_connections: 호스트별로 유지할 커넥션 풀 개수
+    :param pool_maxsize: 커넥션 풀당 최대 연결 수
+    :return: 설정된 requests.Session
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True, # 429/503 응답의 Retry-After 만큼 대기
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# 파이프라인 전체에서 공유하는 HTTP 세션 (PDF 다운로드 등)
+SESSION = create_session()
+
+# Groq SDK는 httpx를 사용하므로 LLM 호출용 커넥션 풀은 별도의 httpx.Client로 공유
+# (http_client를 직접 넘기면 SDK 기본 타임아웃이 적용되지 않으므로 동일한 값으로 설정)
+LLM_HTTP_CLIENT = httpx.Client(
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=16),
+)
@@ -0,0 +1,66 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+def make_cache_key(arxiv_id: str, model_name: str, prompt_version: str, content: str) -> str:
+    """논문 ID, 모델, 프롬프트 버전, 입력 내용 해시를 조합하여 캐시 키를 생성"""
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    raw_key = "|".join([arxiv_id or "", model_name or "", prompt_version or "", content_hash])
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+class LLMCache:
+    """
+    LLM 스코어링/요약 결과를 SQLite 파일에 저장하는 디스크 캐시.
+    같은 논문이 재실행이나 겹치는 날짜 윈도우로 다시 처리될 때 Groq 호출을 생략합니다.
+    """
+    def __init__(self, db_path: str, ttl_days: Optional[float] = None):
+        """
+        :param db_path: 캐시 데이터베이스 파일 경로
+        :param ttl_days: 캐시 항목의 유효 기간 (일). None이면 만료되지 않음
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # 여러 스레드가 하나의 연결을 공유하므로 쓰기 시 잠금을 사용
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL 모드: 매 커밋마다 전체 저널을 다시 쓰지 않아 잦은 소량 쓰기가 빠름
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts INTEGER NOT NULL)"
+            )
+            # 만료된 항목은 읽지 않으므로 열 때 삭제하여 캐시 파일이 계속 커지지 않도록 함
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM llm_cache WHERE ts < ?", (int(time.time() - self.ttl_seconds),))
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 값을 반환하고, 없거나 유효 기간이 지났으면 None을 반환"""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, ts FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if self.ttl_seconds is not None and time.time() - row[1] > self.ttl_seconds:
+                return None
+            return json.loads(row[0])
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logging.warning(f"Failed to read LLM cache: {e}")
+            return None
+
+    def set(self, key: str, value: Any):
+        """값을 JSON으로 직렬화하여 캐시에 저장"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, ts) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), int(time.time()))
+                )
+        except (sqlite3.Error, TypeError) as e:
+            logging.warning(f"Failed to write LLM cache: {e}")
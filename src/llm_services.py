@@ -1,15 +1,129 @@
 import os
+import re
+import random
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+import httpx
+from typing import List, Dict, Any, Optional, Tuple
 from groq import Groq, RateLimitError, APIError
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
+from tenacity import Retrying, wait_exponential, retry_if_exception_type, RetryError
+
+from .http_client import LLM_HTTP_CLIENT
+
+# x-ratelimit-reset-* 헤더의 기간 표기 (예: "2m59.56s", "7.66s", "250ms")
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+# x-ratelimit-reset-requests는 요청 한도 전체가 다시 채워지는 시점이므로 대기 시간 계산에 쓰지 않음
+_RATE_LIMIT_RESET_HEADERS = ("retry-after", "x-ratelimit-reset-tokens")
+_MAX_RETRY_WAIT = 60.0
+_MAX_ATTEMPTS_PER_MODEL = 5
+_fallback_wait = wait_exponential(multiplier=1, min=2, max=60)
+
+def _parse_wait_seconds(value: str) -> Optional[float]:
+    """Retry-After(초) 또는 x-ratelimit-reset-*(기간 문자열) 값을 초 단위로 변환"""
+    try:
+        return float(value)
+    except ValueError:
+        matches = _DURATION_RE.findall(value)
+        if not matches:
+            return None
+        return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+def _requested_wait(retry_state) -> float:
+    """
+    429(RateLimitError) 응답이면 서버가 알려준 재시도 가능 시점(Retry-After, x-ratelimit-reset-tokens)만큼 대기합니다.
+    그 외 일시적인 오류(5xx 등)나 헤더가 없는 경우에는 기존 지수 백오프로 대기합니다.
+    """
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    response = getattr(exc, "response", None) if isinstance(exc, RateLimitError) else None
+    headers = getattr(response, "headers", None)
+    if headers:
+        for header in _RATE_LIMIT_RESET_HEADERS:
+            value = headers.get(header)
+            seconds = _parse_wait_seconds(value) if value else None
+            if seconds is not None:
+                # 여러 스레드가 동시에 같은 시점에 재시도하지 않도록 약간의 지터를 더함
+                return min(seconds + random.uniform(0, 0.3 * max(seconds, 1.0)), _MAX_RETRY_WAIT)
+    return _fallback_wait(retry_state)
+
+def _remaining_time(retry_state) -> Optional[float]:
+    """호출자가 지정한 마감 시각까지 남은 시간 (마감 시각이 없으면 None)"""
+    deadline = retry_state.kwargs.get("deadline")
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+def _wait_from_headers(retry_state) -> float:
+    """재시도 대기 시간을 계산하되, 마감 시각을 넘겨 대기하지 않도록 남은 시간으로 제한"""
+    wait = _requested_wait(retry_state)
+    remaining = _remaining_time(retry_state)
+    return wait if remaining is None else min(wait, remaining)
+
+def _stop_retrying(retry_state) -> bool:
+    """
+    모델당 최대 시도 횟수에 도달했거나, 다음 시도까지 기다릴 시간이 마감 시각까지 남은 시간보다 길면 재시도 중단
+    (대기 시간은 남은 시간으로 제한되므로, 제한에 걸렸다면 대기 후 시도할 시간이 없다는 뜻)
+    """
+    if retry_state.attempt_number >= _MAX_ATTEMPTS_PER_MODEL:
+        return True
+    remaining = _remaining_time(retry_state)
+    return remaining is not None and remaining <= (getattr(retry_state, "upcoming_sleep", 0) or 0)
+
+def _log_retry(retry_state):
+    logging.warning(
+        f"Rate limit/API error on model {retry_state.kwargs.get('model')}. "
+        f"Retrying in {int(retry_state.next_action.sleep)}s... (Attempt {retry_state.attempt_number})"
+    )
+
+# 모든 서비스/모델이 공유하는 재시도 정책 (호출마다 데코레이터를 새로 만들지 않음)
+_RETRYING = Retrying(
+    wait=_wait_from_headers,
+    stop=_stop_retrying,
+    retry=retry_if_exception_type((RateLimitError, APIError)),
+    before_sleep=_log_retry,
+)
+
+class TokenBucket:
+    """
+    분당 토큰 한도(TPM)를 지키기 위한 스레드 안전 토큰 버킷.
+    여러 스레드가 동시에 LLM을 호출할 때 고정 지연 대신 남은 토큰 양에 따라 대기시킵니다.
+    """
+    def __init__(self, tokens_per_minute: int, capacity: Optional[int] = None):
+        """
+        :param tokens_per_minute: 분당 보충되는 토큰 수
+        :param capacity: 버킷 최대 용량 (기본값: tokens_per_minute)
+        """
+        if tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive.")
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = capacity or tokens_per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        """토큰이 충분히 쌓일 때까지 대기한 뒤 차감 (용량보다 큰 요청은 용량만큼만 차감)"""
+        tokens = min(max(tokens, 1), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
 
 class BaseLLMService:
     """
     Groq LLM 서비스를 직접 사용하기 위한 기본 클래스.
     API 키 로딩, LLM 객체 초기화, 폴백 및 재시도 로직을 포함
     """
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, http_client: Optional[httpx.Client] = None):
+        """
+        :param config: 모델, 폴백 리스트, API 키 환경변수 등을 담은 설정 딕셔너리
+        :param http_client: Groq 호출에 사용할 httpx 클라이언트 (기본값: 파이프라인 공유 클라이언트)
+        """
         self.config = config
         self.model_name = config.get("model")
         if not self.model_name:
@@ -19,45 +133,63 @@ class BaseLLMService:
         if not api_key:
             raise ValueError(f"API key not found. Please set the {config.get('api_key_env', 'GROQ_API_KEY')} environment variable.")
 
-        self.client = Groq(api_key=api_key)
+        # 모든 LLM 서비스가 하나의 커넥션 풀을 공유하여 호출마다 TLS 연결을 새로 맺지 않도록 함
+        self.client = Groq(api_key=api_key, http_client=http_client or LLM_HTTP_CLIENT)
+
+        # 기본 모델을 맨 앞에 두고, 공백/대소문자만 다른 중복 모델은 한 번만 시도 (설정의 리스트는 변경하지 않음)
+        unique_models = {}
+        for model in [self.model_name] + list(config.get("model_fallback_list") or []):
+            model = model.strip()
+            unique_models.setdefault(model.lower(), model)
+        self.model_fallback_list = list(unique_models.values())
+
+    def _create_completion(self, *, model: str, messages: List[Dict[str, str]], is_json: bool, deadline: Optional[float]) -> str:
+        """단일 모델로 LLM을 한 번 호출 (deadline은 재시도 중단 판단용으로만 사용)"""
+        request_params = {
+            "messages": messages,
+            "model": model,
+            "temperature": self.config.get("temperature", 0.2),
+        }
+        if is_json:
+            request_params["response_format"] = {"type": "json_object"}
 
-        self.model_fallback_list = config.get("model_fallback_list", [])
-        if self.model_name in self.model_fallback_list:
-            self.model_fallback_list.remove(self.model_name)
-        self.model_fallback_list.insert(0, self.model_name)
+        # 스트리밍 모드에서는 생성되는 토큰을 도착하는 대로 읽어 마지막에 한 번만 합침
+        if self.config.get("stream", False):
+            stream = self.client.chat.completions.create(stream=True, **request_params)
+            parts = []
+            for chunk in stream:
+                if chunk.choices:
+                    parts.append(chunk.choices[0].delta.content or "")
+            return "".join(parts)
 
-    def _invoke_with_fallback(self, messages: List[Dict[str, str]], is_json: bool = False) -> Optional[str]:
-        """모델 폴백 및 재시도 로직으로 LLM을 호출"""
+        chat_completion = self.client.chat.completions.create(**request_params)
+        return chat_completion.choices[0].message.content
+
+    def _invoke_with_fallback(self, messages: List[Dict[str, str]], is_json: bool = False, deadline: Optional[float] = None) -> Optional[str]:
+        """
+        모델 폴백 및 재시도 로직으로 LLM을 호출
+
+        :param deadline: time.monotonic() 기준 마감 시각. 지나면 재시도와 다음 모델 시도를 중단
+        """
+        return self._invoke_with_model(messages, is_json=is_json, deadline=deadline)[0]
+
+    def _invoke_with_model(self, messages: List[Dict[str, str]], is_json: bool = False,
+                           deadline: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        _invoke_with_fallback과 같지만 실제로 응답한 모델 이름을 함께 반환합니다.
+
+        :return: (응답, 응답한 모델) 튜플. 모든 모델이 실패하면 (None, None)
+        """
         for model in self.model_fallback_list:
+            if deadline is not None and time.monotonic() >= deadline:
+                logging.error(f"Deadline exceeded before trying model '{model}'. Giving up.")
+                break
             try:
                 logging.info(f"Attempting to use model: {model}")
-
-                @retry(
-                    wait=wait_exponential(multiplier=1, min=2, max=60),
-                    stop=stop_after_attempt(3),
-                    retry=retry_if_exception_type((RateLimitError, APIError)),
-                    before_sleep=lambda rs: logging.warning(
-                        f"Rate limit/API error on model {model}. "
-                        f"Retrying in {int(rs.next_action.sleep)}s... (Attempt {rs.attempt_number})"
-                    )
-                )
-                def invoke_with_single_model():
-                    request_params = {
-                        "messages": messages,
-                        "model": model,
-                        "temperature": self.config.get("temperature", 0.2),
-                    }
-                    if is_json:
-                        request_params["response_format"] = {"type": "json_object"}
-                    
-                    chat_completion = self.client.chat.completions.create(**request_params)
-                    return chat_completion.choices[0].message.content
-
-                return invoke_with_single_model()
-
+                return _RETRYING(self._create_completion, model=model, messages=messages, is_json=is_json, deadline=deadline), model
             except (RateLimitError, RetryError) as e:
                 logging.warning(f"Rate limit retries failed for model '{model}'. Trying next model. Error: {e}")
                 continue
         
         logging.error("All models in fallback list failed due to rate limits.")
-        return None 
\ No newline at end of file
+        return None, None
@@ -0,0 +1,55 @@
+import os
+import gzip
+import time
+import hashlib
+import logging
+from typing import Optional
+
+def _cache_path(cache_dir: str, arxiv_id: str, max_pages: Optional[int] = None, stop_at_references: bool = True) -> str:
+    """
+    arxiv_id와 추출 설정을 해시하여 캐시 파일 경로를 계산 (하위 디렉토리로 분산 저장)
+    추출 설정이 바뀌면 다른 키가 되어 이전 설정으로 추출한 텍스트를 사용하지 않음
+    """
+    key = hashlib.sha1(f"{arxiv_id}|{max_pages}|{stop_at_references}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key[:2], f"{key}.txt.gz")
+
+def load_cached_text(cache_dir: str, arxiv_id: str, max_age_days: Optional[int] = None,
+                     max_pages: Optional[int] = None, stop_at_references: bool = True) -> Optional[str]:
+    """
+    캐시된 PDF 텍스트를 읽어옵니다.
+
+    :param cache_dir: 캐시 루트 디렉토리
+    :param arxiv_id: 논문의 arxiv ID
+    :param max_age_days: 캐시 유효 기간 (일). None 또는 0 이하이면 만료되지 않음
+    :param max_pages: 텍스트 추출 시 사용한 최대 페이지 수
+    :param stop_at_references: 텍스트 추출 시 참고문헌 섹션에서 중단했는지 여부
+    :return: 캐시된 텍스트 또는 캐시가 없거나 만료된 경우 None
+    """
+    path = _cache_path(cache_dir, arxiv_id, max_pages, stop_at_references)
+    try:
+        if max_age_days and max_age_days > 0:
+            age_seconds = time.time() - os.path.getmtime(path)
+            if age_seconds > max_age_days * 86400:
+                logging.info(f"PDF cache for {arxiv_id} is expired. Re-downloading.")
+                return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError) as e:
+        logging.warning(f"Failed to read PDF cache for {arxiv_id}: {e}")
+        return None
+
+def save_cached_text(cache_dir: str, arxiv_id: str, text: str,
+                     max_pages: Optional[int] = None, stop_at_references: bool = True):
+    """추출된 PDF 텍스트를 추출 설정별로 압축하여 캐시에 저장"""
+    path = _cache_path(cache_dir, arxiv_id, max_pages, stop_at_references)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 동시에 같은 논문을 저장하더라도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Failed to write PDF cache for {arxiv_id}: {e}")
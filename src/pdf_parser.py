@@ -1,15 +1,42 @@
+import io
+import re
 import requests
 import pymupdf  # Fitz
 import logging
+import logging.handlers
 from typing import Optional
 
-def download_and_extract_pdf_text(pdf_url: str, timeout: int = 30) -> Optional[str]:
+from .http_client import SESSION
+
+# 일반 텍스트 추출 플래그: 이미지/합자 보존 등 요약에 쓰이지 않는 처리를 생략
+TEXT_FLAGS = pymupdf.TEXT_PRESERVE_WHITESPACE | pymupdf.TEXT_MEDIABOX_CLIP
+
+# 참고문헌/감사의 글 섹션 제목만 단독으로 있는 줄 (예: "References", "7 REFERENCES", "Acknowledgments")
+_BACK_MATTER_RE = re.compile(
+    r"^[ \t]*(?:\d+\.?[ \t]*)?(?:References|Bibliography|Acknowledg(?:e)?ments?)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+def init_parse_worker(log_queue, log_level: int = logging.INFO):
     """
-    PDF URL에서 파일을 다운로드하고 텍스트 내용을 추출합니다.
+    텍스트 추출용 프로세스 풀 워커를 초기화합니다.
+    워커마다 pymupdf를 한 번만 로드하고, 로그는 부모 프로세스의 로깅 큐로 보내 콘솔/파일 핸들러가 함께 기록하도록 합니다.
+    """
+    logger = logging.getLogger()
+    logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(log_level)
+    logging.debug(f"PDF parse worker initialized with pymupdf {pymupdf.VersionBind}")
+
+def download_pdf(pdf_url: str, timeout: int = 30, session: Optional[requests.Session] = None) -> Optional[bytes]:
+    """
+    PDF URL에서 파일을 다운로드합니다.
+    429/5xx 응답은 세션의 재시도 정책에 따라 Retry-After를 지켜 재시도됩니다.
 
     :param pdf_url: 다운로드할 PDF의 URL
     :param timeout: 요청 타임아웃 시간 (초)
-    :return: 추출된 텍스트 또는 실패 시 None
+    :param session: 사용할 HTTP 세션 (기본값: 파이프라인 공유 세션)
+    :return: PDF 바이트 또는 실패 시 None
     """
     if not pdf_url:
         logging.error("PDF URL is missing.")
@@ -17,28 +44,77 @@ def download_and_extract_pdf_text(pdf_url: str, timeout: int = 30) -> Optional[s
         
     logging.info(f"Downloading PDF from: {pdf_url}")
     try:
-        response = requests.get(pdf_url, timeout=timeout)
-        response.raise_for_status()  # HTTP 오류가 발생하면 예외를 발생시킴
+        # 응답을 with 블록으로 닫아 오류 시에도 연결이 즉시 커넥션 풀로 반환되도록 함
+        with (session or SESSION).get(pdf_url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()  # HTTP 오류가 발생하면 예외를 발생시킴
+            # 청크 리스트를 만든 뒤 합치는 response.content 대신 하나의 버퍼로 바로 복사하여 피크 메모리를 줄임
+            # (iter_content는 전송 중 urllib3 오류를 requests 예외로 변환하므로 아래 except에서 처리됨)
+            buf = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                buf.write(chunk)
+            return buf.getvalue()
     except requests.exceptions.RequestException as e:
         logging.error(f"Error downloading PDF from {pdf_url}: {e}", exc_info=True)
         return None
 
+def extract_text_from_bytes(data: bytes, source: str = "", max_pages: Optional[int] = None,
+                            stop_at_references: bool = True) -> Optional[str]:
+    """
+    메모리에 있는 PDF 바이트에서 텍스트 내용을 추출합니다.
+
+    :param data: PDF 파일 바이트
+    :param source: 로그에 표시할 PDF 출처 (예: URL)
+    :param max_pages: 추출할 최대 페이지 수 (None이면 전체 페이지)
+    :param stop_at_references: 참고문헌/감사의 글 섹션 제목이 나오면 그 앞에서 추출을 중단할지 여부
+    :return: 추출된 텍스트 또는 실패 시 None
+    """
     try:
         # 메모리에서 직접 PDF 열기
-        with pymupdf.open(stream=response.content, filetype="pdf") as doc:
-            text = ""
-            for page in doc:
-                text += page.get_text()
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            parts = []
+            page_count = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
+            for page_no in range(page_count):
+                # 페이지를 하나씩 로드하고 텍스트만 남긴 뒤 바로 해제하여 큰 PDF에서도 메모리 사용량을 일정하게 유지
+                page = doc.load_page(page_no)
+                page_text = page.get_text("text", flags=TEXT_FLAGS, sort=False)
+                del page
+                # 요약에 쓰이지 않는 참고문헌 이후는 잘라냄 (첫 페이지는 본문이므로 검사하지 않음)
+                if stop_at_references and page_no > 0:
+                    match = _BACK_MATTER_RE.search(page_text)
+                    if match:
+                        parts.append(page_text[:match.start()])
+                        logging.debug(f"Stopped extraction at '{match.group().strip()}' on page {page_no + 1} of {source}")
+                        break
+                parts.append(page_text)
+            text = "".join(parts)
             
-            if not text.strip():
-                logging.warning(f"No text could be extracted from {pdf_url}")
+            # strip()으로 전체 텍스트를 복사하지 않고 공백 여부만 검사
+            if not text or text.isspace():
+                logging.warning(f"No text could be extracted from {source}")
                 return None
             
-            logging.info(f"Successfully extracted text from {pdf_url} ({len(text)} chars)")
+            logging.info(f"Successfully extracted text from {source} ({len(text)} chars)")
             return text
     except Exception as e:
-        logging.error(f"Error parsing PDF file from {pdf_url}: {e}", exc_info=True)
+        logging.error(f"Error parsing PDF file from {source}: {e}", exc_info=True)
+        return None
+
+def download_and_extract_pdf_text(pdf_url: str, timeout: int = 30, session: Optional[requests.Session] = None,
+                                  max_pages: Optional[int] = None, stop_at_references: bool = True) -> Optional[str]:
+    """
+    PDF URL에서 파일을 다운로드하고 텍스트 내용을 추출합니다.
+
+    :param pdf_url: 다운로드할 PDF의 URL
+    :param timeout: 요청 타임아웃 시간 (초)
+    :param session: 사용할 HTTP 세션 (기본값: 파이프라인 공유 세션)
+    :param max_pages: 추출할 최대 페이지 수 (None이면 전체 페이지)
+    :param stop_at_references: 참고문헌/감사의 글 섹션 제목이 나오면 그 앞에서 추출을 중단할지 여부
+    :return: 추출된 텍스트 또는 실패 시 None
+    """
+    data = download_pdf(pdf_url, timeout=timeout, session=session)
+    if data is None:
         return None
+    return extract_text_from_bytes(data, source=pdf_url, max_pages=max_pages, stop_at_references=stop_at_references)
 
 if __name__ == '__main__':
     # 예제 사용법 (실제 Arxiv PDF URL)
@@ -1,7 +1,43 @@
 import os
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+
+# 논문별 마크다운 블록 템플릿 (모듈 로드 시 한 번만 정의하고 format_map으로 채움)
+_PAPER_HEADER_TMPL = "### {idx}. {title}\n\n"
+_PAPER_META_TMPL = (
+    "- **Keyword Score**: {score}\n"
+    "- **Authors**: {authors}\n"
+    "- **URL**: <{url}>\n"
+    "- **Submitted**: {submitted}\n"
+)
+_TARGET_SUMMARY_TMPL = (
+    "#### T.A.R.G.E.T. Summary (from {source})\n"
+    "- **Topic**: {topic}\n"
+    "- **Aim**: {aim}\n"
+    "- **Rationale**: {rationale}\n"
+    "- **Ground**: {ground}\n"
+    "- **Experiment**: {experiment}\n"
+    "- **Takeaway**: {takeaway}\n\n"
+)
+_ABSTRACT_TMPL = "#### Abstract\n> {abstract}\n\n"
+
+class _DefaultView(dict):
+    """format_map에서 없는 키를 'N/A'로 채우는 딕셔너리"""
+    def __missing__(self, key):
+        return 'N/A'
+
+def _paper_view(paper: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    """논문 딕셔너리를 템플릿에 채울 값들로 변환"""
+    return {
+        "idx": idx,
+        "title": paper.get('title', 'N/A'),
+        "score": paper.get('score', 0),
+        "authors": ', '.join(paper.get('authors', [])),
+        "url": paper.get('url', '#'),
+        "submitted": paper.get('submitted', 'N/A'),
+        "abstract": paper.get('abstract', 'No abstract available.'),
+    }
 
 class MarkdownReporter:
     """
@@ -11,9 +47,53 @@ class MarkdownReporter:
         self.report_path = config.get("reporter", {}).get("report_path", "reports")
         self.top_n = config.get("reporter", {}).get("top_n", 10)
 
-    def generate_report(self, papers: List[Dict[str, Any]], project_root: str, target_date: datetime.date):
+    def _render_paper(self, paper: Dict[str, Any], idx: int, *, include_target_summary: bool) -> str:
+        """
+        논문 하나의 마크다운 블록을 생성 (상위 논문/그 외 논문 섹션 공통)
+
+        :param include_target_summary: T.A.R.G.E.T. 요약이 있으면 함께 표시할지 여부
+        """
+        view = _paper_view(paper, idx)
+        parts = [_PAPER_HEADER_TMPL.format_map(view)]
+
+        # LLM 점수와 키워드 점수를 모두 표시
+        llm_score = paper.get('llm_score')
+        if llm_score is not None:
+            parts.append(f"- **LLM Score**: {llm_score}\n")
+        parts.append(_PAPER_META_TMPL.format_map(view))
+
+        # Comment가 있는 경우에만 표시
+        if paper.get('comment'):
+            parts.append(f"- **Comment**: {paper.get('comment')}\n")
+
+        # 키워드 기반 점수 이유 표시
+        keyword_reasons = paper.get('keyword_reasons', [])
+        if keyword_reasons:
+            # "Found 'keyword' (score: +N)" 형식에서 키워드만 추출
+            topic_keywords = [r.split("'")[1] for r in keyword_reasons if "'" in r]
+            if topic_keywords:
+                parts.append(f"- **Topic Keywords**: {', '.join(topic_keywords)}\n")
+
+        # LLM 기반 점수 이유 표시
+        llm_reason = paper.get('llm_reason')
+        if llm_reason:
+            parts.append(f"- **Reason**: {llm_reason}\n")
+
+        parts.append("\n")  # 요약 섹션과 구분을 위해 한 줄 추가
+
+        # T.A.R.G.E.T. 요약이 있으면 표시
+        if include_target_summary and paper.get('target_summary'):
+            parts.append(_TARGET_SUMMARY_TMPL.format_map(_DefaultView(paper['target_summary'])))
+
+        # 원문 초록을 항상 표시
+        parts.append(_ABSTRACT_TMPL.format_map(view))
+        return "".join(parts)
+
+    def generate_report(self, papers: List[Dict[str, Any]], project_root: str, target_date: Optional[date] = None):
         """
         Top-N 논문에 대한 마크다운 리포트를 생성하고 저장
+
+        :param target_date: 리포트 날짜 (기본값: 오늘)
         """
         if not papers:
             logging.warning("No relevant papers to report.")
@@ -24,6 +104,7 @@ class MarkdownReporter:
         os.makedirs(report_dir, exist_ok=True)
         
         # 리포트 파일 경로 설정
+        target_date = target_date or datetime.now().date()
         target_date_str = target_date.strftime("%Y-%m-%d")
         report_filepath = os.path.join(report_dir, f"{target_date_str}.md")
         
@@ -31,104 +112,33 @@ class MarkdownReporter:
         top_papers = papers[:self.top_n]
         other_papers = papers[self.top_n:]
         
-        # 마크다운 내용 생성
-        md_content = f"# Daily Papers Report - {target_date_str}\n\n"
+        # 마크다운 내용 생성 (조각을 리스트에 모은 뒤 한 번에 파일로 기록)
+        parts = [f"# Daily Papers Report - {target_date_str}\n\n"]
 
         # --- 요약된 상위 논문 섹션 ---
         if top_papers:
-            md_content += f"## 🌟 Top {len(top_papers)} Papers with Summaries\n\n"
-            md_content += f"선정된 Top {len(top_papers)}개 논문에 대한 상세 요약입니다.\n\n"
+            parts.append(f"## 🌟 Top {len(top_papers)} Papers with Summaries\n\n")
+            parts.append(f"선정된 Top {len(top_papers)}개 논문에 대한 상세 요약입니다.\n\n")
         
         for i, paper in enumerate(top_papers, 1):
-            md_content += f"### {i}. {paper.get('title', 'N/A')}\n\n"
-            
-            # LLM 점수와 키워드 점수를 모두 표시
-            llm_score = paper.get('llm_score')
-            if llm_score is not None:
-                md_content += f"- **LLM Score**: {llm_score}\n"
-            md_content += f"- **Keyword Score**: {paper.get('score', 0)}\n"
-            
-            md_content += f"- **Authors**: {', '.join(paper.get('authors', []))}\n"
-            md_content += f"- **URL**: <{paper.get('url', '#')}>\n"
-            md_content += f"- **Submitted**: {paper.get('submitted', 'N/A')}\n"
-            
-            # Comment가 있는 경우에만 표시
-            if paper.get('comment'):
-                md_content += f"- **Comment**: {paper.get('comment')}\n"
-            
-            # 키워드 기반 점수 이유 표시
-            keyword_reasons = paper.get('keyword_reasons', [])
-            if keyword_reasons:
-                # "Found 'keyword' (score: +N)" 형식에서 키워드만 추출
-                topic_keywords = [r.split("'")[1] for r in keyword_reasons if "'" in r]
-                if topic_keywords:
-                    md_content += f"- **Topic Keywords**: {', '.join(topic_keywords)}\n"
-
-            # LLM 기반 점수 이유 표시
-            llm_reason = paper.get('llm_reason')
-            if llm_reason:
-                md_content += f"- **Reason**: {llm_reason}\n"
-
-            md_content += "\n"  # 요약 섹션과 구분을 위해 한 줄 추가
-        
-            # T.A.R.G.E.T. 요약이 있으면 표시
-            if paper.get('target_summary'):
-                summary = paper['target_summary']
-                source = summary.get('source', 'N/A')
-                md_content += f"#### T.A.R.G.E.T. Summary (from {source})\n"
-                md_content += f"- **Topic**: {summary.get('topic', 'N/A')}\n"
-                md_content += f"- **Aim**: {summary.get('aim', 'N/A')}\n"
-                md_content += f"- **Rationale**: {summary.get('rationale', 'N/A')}\n"
-                md_content += f"- **Ground**: {summary.get('ground', 'N/A')}\n"
-                md_content += f"- **Experiment**: {summary.get('experiment', 'N/A')}\n"
-                md_content += f"- **Takeaway**: {summary.get('takeaway', 'N/A')}\n\n"
-
-            # 원문 초록을 항상 표시
-            md_content += f"#### Abstract\n"
-            md_content += f"> {paper.get('abstract', 'No abstract available.')}\n\n"
-
-            md_content += "---\n\n"
+            parts.append(self._render_paper(paper, i, include_target_summary=True))
+            parts.append("---\n\n")
 
         # --- 그 외 주목할 만한 논문 섹션 ---
         if other_papers:
-            md_content += f"## 📝 Other Noteworthy Papers\n\n"
-            md_content += f"LLM이 스코어링했지만, Top {self.top_n}에 포함되지 않은 나머지 논문들입니다.\n\n"
+            parts.append(f"## 📝 Other Noteworthy Papers\n\n")
+            parts.append(f"LLM이 스코어링했지만, Top {self.top_n}에 포함되지 않은 나머지 논문들입니다.\n\n")
 
             for i, paper in enumerate(other_papers, self.top_n + 1):
-                md_content += f"### {i}. {paper.get('title', 'N/A')}\n\n"
-                
-                llm_score = paper.get('llm_score')
-                if llm_score is not None:
-                    md_content += f"- **LLM Score**: {llm_score}\n"
-                md_content += f"- **Keyword Score**: {paper.get('score', 0)}\n"
-                
-                md_content += f"- **Authors**: {', '.join(paper.get('authors', []))}\n"
-                md_content += f"- **URL**: <{paper.get('url', '#')}>\n"
-                md_content += f"- **Submitted**: {paper.get('submitted', 'N/A')}\n"
-
-                if paper.get('comment'):
-                    md_content += f"- **Comment**: {paper.get('comment')}\n"
-                
-                keyword_reasons = paper.get('keyword_reasons', [])
-                if keyword_reasons:
-                    topic_keywords = [r.split("'")[1] for r in keyword_reasons if "'" in r]
-                    if topic_keywords:
-                        md_content += f"- **Topic Keywords**: {', '.join(topic_keywords)}\n"
-
-                llm_reason = paper.get('llm_reason')
-                if llm_reason:
-                    md_content += f"- **Reason**: {llm_reason}\n"
-                
-                md_content += "\n"
-                
-                md_content += f"#### Abstract\n"
-                md_content += f"> {paper.get('abstract', 'No abstract available.')}\n\n"
-
-            md_content += "---\n\n"
+                parts.append(self._render_paper(paper, i, include_target_summary=False))
+
+            parts.append("---\n\n")
             
-        # 리포트 파일 저장
-        with open(report_filepath, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        # 리포트 파일 저장 (임시 파일에 쓴 뒤 교체하여 중단 시에도 반쯤 쓰인 리포트가 남지 않도록 함)
+        tmp_filepath = f"{report_filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, 'w', encoding='utf-8') as f:
+            f.writelines(parts)
+        os.replace(tmp_filepath, report_filepath)
             
         logging.info(f"Successfully generated report at: {report_filepath}")
         return report_filepath
@@ -1,50 +1,96 @@
-import os
+import re
 import json
 import logging
+import string
 import time
-from typing import Dict, Any, Optional, List
+import httpx
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 from groq import RateLimitError, APIError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
-from .llm_services import BaseLLMService
+from .llm_services import BaseLLMService, TokenBucket
+from .llm_cache import LLMCache, make_cache_key
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    # 미설치 환경에서는 진행 표시줄 없이 동작
+    tqdm = None
+
+# 단어/숫자 덩어리와 개별 기호를 하나의 토큰으로 보는 근사 토크나이저 (BPE 토큰 수와 대략 비슷함)
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 LLM 토큰 수를 근사"""
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
 
 def split_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
     """간단한 텍스트 분할 함수"""
     if chunk_size <= chunk_overlap:
         raise ValueError("chunk_size must be greater than chunk_overlap")
     
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        if end >= len(text):
-            break
-        start += chunk_size - chunk_overlap
-    return chunks
+    if not text:
+        return []
+    # 마지막 청크가 텍스트 끝에 닿으면 중단되도록 시작 위치의 상한을 (길이 - 겹침)으로 둠
+    step = chunk_size - chunk_overlap
+    return [text[i:i + chunk_size] for i in range(0, max(len(text) - chunk_overlap, 1), step)]
+
+# 요약 프롬프트 파일 경로 (모듈 로드 시 한 번만 계산)
+_PROMPT_PATH = Path(__file__).resolve().parent.parent / "configs" / "prompt.json"
+
+@lru_cache(maxsize=1)
+def _load_prompts(prompt_path: Path) -> Dict[str, str]:
+    """요약용 프롬프트 템플릿을 한 번만 읽어 캐시"""
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        return json.load(f)["summarize_target_map_reduce"]
+
+def _split_template(template: str, field: str) -> tuple:
+    """
+    필드가 하나뿐인 템플릿을 (앞부분, 뒷부분)으로 미리 분리합니다.
+    호출마다 str.format으로 템플릿을 해석하는 대신 문자열 연결만으로 프롬프트를 만들 수 있습니다.
+    """
+    prefix, suffix, seen = [], [], False
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        (suffix if seen else prefix).append(literal)
+        if name is None:
+            continue
+        if name != field or spec or conversion or seen:
+            raise ValueError(f"Template must contain exactly one plain '{{{field}}}' placeholder.")
+        seen = True
+    if not seen:
+        raise ValueError(f"Template has no '{{{field}}}' placeholder.")
+    return "".join(prefix), "".join(suffix)
 
 class CSPaperSummarizer:
     """
     T.A.R.G.E.T 프레임워크를 사용하여 CS 논문을 요약하는 클래스.
     Map-Reduce 방식을 사용하여 긴 논문도 처리합니다.
     """
-    def __init__(self, document_content: str, config: dict, groq_config: dict):
+    def __init__(self, config: dict, groq_config: dict, http_client: Optional[httpx.Client] = None,
+                 llm_cache: Optional[LLMCache] = None):
         """
         CSPaperSummarizer를 초기화합니다.
+        LLM 클라이언트는 여기서 한 번만 생성되며, 여러 논문을 요약할 때 재사용됩니다.
 
-        :param document_content: 요약할 논문의 전체 텍스트
         :param config: summarizer에 대한 설정 딕셔너리
         :param groq_config: groq_settings에 대한 공통 설정 딕셔너리
+        :param http_client: Groq 호출에 사용할 httpx 클라이언트 (기본값: 파이프라인 공유 클라이언트)
+        :param llm_cache: 청크/중간 요약 결과를 재사용할 디스크 캐시 (None이면 캐시하지 않음)
         """
-        self.document_content = document_content
         self.config = config
-        # PAYLOAD_LIMIT을 config에서 읽어와 인스턴스 변수로 저장
-        self.payload_limit = self.config.get("payload_limit", 12000)
+        self.llm_cache = llm_cache
+        # Reduce 단계에서 한 번의 요청에 담을 최대 토큰 수
+        self.payload_tokens = self.config.get("payload_tokens", 3500)
         
         # Map과 Reduce를 위한 LLM 서비스를 각각, 별도의 폴백 리스트와 함께 초기화
         map_config = {
             **groq_config,
             "model": config.get("map_model"),
-            "model_fallback_list": config.get("map_fallback_list", [])
+            "model_fallback_list": config.get("map_fallback_list", []),
+            # 청크 요약은 스트리밍으로 받아 응답 지연을 줄임 (최종 JSON 요약은 비스트리밍)
+            "stream": config.get("map_stream", True),
         }
         reduce_config = {
             **groq_config,
@@ -52,58 +98,105 @@ class CSPaperSummarizer:
             "model_fallback_list": config.get("reduce_fallback_list", [])
         }
         
-        self.map_llm_service = BaseLLMService(config=map_config)
-        self.reduce_llm_service = BaseLLMService(config=reduce_config)
+        self.map_llm_service = BaseLLMService(config=map_config, http_client=http_client)
+        self.reduce_llm_service = BaseLLMService(config=reduce_config, http_client=http_client)
+
+        self.prompts = _load_prompts(_PROMPT_PATH)
+        self._map_template = _split_template(self.prompts["map_prompt"], "input")
+        self._intermediate_template = _split_template(self.prompts["intermediate_reduce_prompt"], "chunk_summaries")
+        self._reduce_template = _split_template(self.prompts["reduce_prompt"], "chunk_summaries")
+
+        self.chunk_size = self.config.get("chunk_size", 4000)
+        self.chunk_overlap = self.config.get("chunk_overlap", 400)
+
+        # Map/중간 Reduce 단계에서 동시에 보낼 LLM 요청 수와, 모든 논문이 공유하는 TPM 한도
+        self.map_concurrency = max(1, self.config.get("map_concurrency", 4))
+        tokens_per_minute = self.config.get("tokens_per_minute")
+        self.rate_limiter = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        # LLM 호출 하나가 재시도/폴백에 쓸 수 있는 최대 시간 (초)
+        self.max_total_wait = self.config.get("max_total_wait", 180)
+
+    def _invoke(self, llm_service: BaseLLMService, prompt: str, is_json: bool = False) -> Optional[str]:
+        """
+        TPM 한도 내에서 단일 프롬프트로 LLM을 호출 (토큰 수는 문자 수 / 4로 추정)
+        같은 모델/프롬프트 버전/프롬프트로 이미 받은 응답이 캐시에 있으면 호출하지 않음
+        """
+        cache_key = None
+        if self.llm_cache is not None:
+            cache_key = make_cache_key("", llm_service.model_name, self.config.get("prompt_version"), prompt)
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response, model = self._call_llm(llm_service, prompt, is_json)
+        # 폴백 모델의 응답은 기본 모델 키로 저장하지 않음 (다음 실행에서 기본 모델로 다시 시도)
+        if response and cache_key is not None and model == llm_service.model_name:
+            # 깨진 JSON 응답을 캐시하면 유효 기간 동안 같은 논문을 다시 요약할 수 없으므로 파싱되는 응답만 저장
+            if is_json:
+                try:
+                    json.loads(response)
+                except json.JSONDecodeError:
+                    return response
+            self.llm_cache.set(cache_key, response)
+        return response
 
-        prompt_path = os.path.join(os.path.dirname(__file__), '..', 'configs', 'prompt.json')
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            self.prompts = json.load(f)["summarize_target_map_reduce"]
+    def _call_llm(self, llm_service: BaseLLMService, prompt: str, is_json: bool) -> Tuple[Optional[str], Optional[str]]:
+        """토큰 버킷으로 TPM 한도를 지키며 LLM을 호출하고 (응답, 응답한 모델)을 반환"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(len(prompt) // 4)
+        messages = [{"role": "user", "content": prompt}]
+        deadline = time.monotonic() + self.max_total_wait
+        return llm_service._invoke_with_model(messages, is_json=is_json, deadline=deadline)
 
+    def _map_chunk(self, indexed_chunk) -> str:
+        """청크 하나를 요약 (실패 시 빈 문자열)"""
+        i, chunk, total = indexed_chunk
+        try:
+            prefix, suffix = self._map_template
+            summary = self._invoke(self.map_llm_service, prefix + chunk + suffix)
+            if summary:
+                return summary
+            logging.error(f"    Fallback failed for chunk {i+1}/{total}. Skipping chunk.")
+        except Exception as e:
+            logging.error(f"    An unexpected error occurred while summarizing chunk {i+1}/{total}: {e}", exc_info=True)
+        return ""
+
+    def _reduce_batch(self, batch: List[str]) -> Optional[str]:
+        """요약문 배치 하나를 중간 요약으로 합침"""
+        prefix, suffix = self._intermediate_template
+        prompt = prefix + "\\n---\\n".join(batch) + suffix
+        return self._invoke(self.reduce_llm_service, prompt)
+
+    def summarize(self, document_content: str, show_progress=True) -> Optional[Dict[str, str]]:
+        """
+        논문 텍스트를 Map-Reduce 방식으로 요약합니다.
+        여러 스레드에서 동시에 호출할 수 있도록 문서별 상태는 지역 변수로만 유지합니다.
+
+        :param document_content: 요약할 논문의 전체 텍스트
+        :param show_progress: tqdm 진행 표시줄 사용 여부
+        :return: T.A.R.G.E.T. 요약 딕셔너리 또는 실패 시 None
+        """
         # Use the local split_text function for chunking
-        chunk_size = self.config.get("chunk_size", 4000)
-        chunk_overlap = self.config.get("chunk_overlap", 400)
-        self.docs = split_text(self.document_content, chunk_size, chunk_overlap)
-        logging.info(f"The document was split into {len(self.docs)} chunks.")
+        docs = split_text(document_content, self.chunk_size, self.chunk_overlap)
+        logging.info(f"The document was split into {len(docs)} chunks.")
 
-    def summarize(self, show_progress=True) -> Optional[Dict[str, str]]:
         # 1. Map step
-        logging.info(f"  > Step 3a: Mapping {len(self.docs)} chunks into summaries...")
-        chunk_summaries = []
-        
-        # tqdm is removed, so we directly iterate over self.docs
-        iterator = self.docs
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                iterator = tqdm(self.docs, desc="    Summarizing chunks", leave=False, dynamic_ncols=True)
-            except ImportError:
-                logging.warning("tqdm not found. Progress bar will not be shown. Please install it with 'pip install tqdm'.")
-        
-        map_prompt_template = self.prompts["map_prompt"]
-        
-        for i, chunk in enumerate(iterator):
-            try:
-                prompt = map_prompt_template.format(input=chunk)
-                messages = [{"role": "user", "content": prompt}]
-                summary = self.map_llm_service._invoke_with_fallback(messages, is_json=False)
-                if summary:
-                    chunk_summaries.append(summary)
+        logging.info(f"  > Step 3a: Mapping {len(docs)} chunks into summaries...")
+
+        # 청크 요약은 네트워크 대기가 대부분이므로 스레드로 동시에 요청하고,
+        # TPM 한도는 고정 지연 대신 토큰 버킷으로 지킴 (executor.map으로 청크 순서 유지)
+        with ThreadPoolExecutor(max_workers=min(self.map_concurrency, max(len(docs), 1))) as executor:
+            iterator = executor.map(self._map_chunk, [(i, chunk, len(docs)) for i, chunk in enumerate(docs)])
+            if show_progress:
+                if tqdm is not None:
+                    iterator = tqdm(iterator, total=len(docs), desc="    Summarizing chunks", leave=False, dynamic_ncols=True)
                 else:
-                    logging.error(f"    Fallback failed for chunk {i+1}/{len(self.docs)}. Skipping chunk.")
-                    chunk_summaries.append("")
-            except Exception as e:
-                logging.error(f"    An unexpected error occurred while summarizing chunk {i+1}/{len(self.docs)}: {e}", exc_info=True)
-                chunk_summaries.append("")
-            
-            # TPM(Tokens Per Minute) 한도를 준수하기 위해 API 호출 사이에 지연 추가
-            time.sleep(8)
+                    logging.warning("tqdm not found. Progress bar will not be shown. Please install it with 'pip install tqdm'.")
+            chunk_summaries = list(iterator)
 
         # 2. Iterative Reduce step
         logging.info(f"  > Step 3b: Reducing {len(chunk_summaries)} summaries into a final T.A.R.G.E.T. summary...")
 
-        intermediate_prompt = self.prompts["intermediate_reduce_prompt"]
-        final_prompt = self.prompts["reduce_prompt"]
-
         current_summaries = [s for s in chunk_summaries if s]
 
         if not current_summaries:
@@ -112,34 +205,27 @@ class CSPaperSummarizer:
 
         while len(current_summaries) > 1:
             logging.info(f"    > Reducing {len(current_summaries)} summaries in batches...")
-            next_level_summaries = []
-            
+            batches = []
             current_batch = []
-            current_batch_length = 0
+            current_batch_tokens = 0
             for summary in current_summaries:
-                # 현재 요약문을 추가하면 페이로드 한계를 넘는지 확인 (그리고 배치가 비어있지 않은지)
-                if current_batch_length + len(summary) > self.payload_limit and current_batch:
-                    # 현재 배치를 처리
-                    prompt = intermediate_prompt.format(chunk_summaries="\\n---\\n".join(current_batch))
-                    messages = [{"role": "user", "content": prompt}]
-                    reduced_summary = self.reduce_llm_service._invoke_with_fallback(messages, is_json=False)
-                    if reduced_summary:
-                        next_level_summaries.append(reduced_summary)
+                summary_tokens = estimate_tokens(summary)
+                # 현재 요약문을 추가하면 토큰 한도를 넘는지 확인 (그리고 배치가 비어있지 않은지)
+                if current_batch_tokens + summary_tokens > self.payload_tokens and current_batch:
+                    batches.append(current_batch)
                     # 배치 초기화
-                    current_batch, current_batch_length = [], 0
+                    current_batch, current_batch_tokens = [], 0
                 
                 current_batch.append(summary)
-                current_batch_length += len(summary)
+                current_batch_tokens += summary_tokens
 
-            # 마지막 남은 배치를 처리
+            # 마지막 남은 배치
             if current_batch:
-                prompt = intermediate_prompt.format(chunk_summaries="\\n---\\n".join(current_batch))
-                messages = [{"role": "user", "content": prompt}]
-                reduced_summary = self.reduce_llm_service._invoke_with_fallback(messages, is_json=False)
-                if reduced_summary:
-                    next_level_summaries.append(reduced_summary)
-                # 여기에도 지연을 추가하여 reduce 단계의 연속 호출 방지
-                time.sleep(8)
+                batches.append(current_batch)
+
+            # 같은 레벨의 배치들은 서로 독립적이므로 동시에 처리 (순서 유지)
+            with ThreadPoolExecutor(max_workers=min(self.map_concurrency, len(batches))) as executor:
+                next_level_summaries = [s for s in executor.map(self._reduce_batch, batches) if s]
             
             current_summaries = next_level_summaries
             if not current_summaries:
@@ -149,10 +235,10 @@ class CSPaperSummarizer:
         # 최종 요약 (T.A.R.G.E.T. 형식)
         if len(current_summaries) == 1:
             logging.info("    > Performing final reduction to T.A.R.G.E.T. format...")
-            final_reduce_prompt = final_prompt.format(chunk_summaries=current_summaries[0])
+            prefix, suffix = self._reduce_template
+            final_reduce_prompt = prefix + current_summaries[0] + suffix
             try:
-                messages = [{"role": "user", "content": final_reduce_prompt}]
-                final_summary_str = self.reduce_llm_service._invoke_with_fallback(messages, is_json=True)
+                final_summary_str = self._invoke(self.reduce_llm_service, final_reduce_prompt, is_json=True)
                 if final_summary_str:
                     return json.loads(final_summary_str)
                 else:
@@ -183,6 +269,6 @@ if __name__ == "__main__":
     #     "chunk_overlap": 200
     # }
     
-    # summarizer = CSPaperSummarizer(document_content, config=test_config)
-    # summary = summarizer.summarize()
+    # summarizer = CSPaperSummarizer(config=test_config, groq_config={})
+    # summary = summarizer.summarize(document_content)
     # print(json.dumps(summary, indent=2))